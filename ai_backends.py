@@ -1,26 +1,45 @@
 # ai_backends.py
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 import openai
 from transformers import pipeline
 import requests
 from config import config
+from error_handling import AIBackendError
+from logger import logger
+from prompt_summary import summarize_files
+from filename_clustering import FilenameClusterer
 
 class AIBackend:
-    def get_organization_suggestions(self, file_list):
+    uses_prompt = True
+
+    def build_prompt(self, file_list):
+        # Prompt with a statistical profile so its size does not grow with the number of files
+        profile = summarize_files(file_list)
+        return f"Analyze the following profile of a directory and suggest an efficient organization structure:\n\n{profile}\n\nProposed organization:"
+
+    def get_organization_suggestions(self, file_list, timeout=None):
+        return self.suggest_from_prompt(self.build_prompt(file_list), timeout)
+
+    def suggest_from_prompt(self, prompt, timeout=None):
         raise NotImplementedError
 
 class OpenAIBackend(AIBackend):
     def __init__(self):
         openai.api_key = config.get("openai_api_key")
 
-    def get_organization_suggestions(self, file_list):
-        prompt = f"Analyze the following list of files and suggest an efficient organization structure:\n\n{file_list}\n\nProposed organization:"
+    def suggest_from_prompt(self, prompt, timeout=None):
         response = openai.Completion.create(
             engine=config.get("openai_model"),
             prompt=prompt,
             max_tokens=config.get("max_tokens"),
             n=1,
             stop=None,
-            temperature=config.get("temperature")
+            temperature=config.get("temperature"),
+            request_timeout=timeout or config.get("request_timeout", 60)
         )
         return response.choices[0].text.strip()
 
@@ -29,8 +48,7 @@ class HuggingFaceBackend(AIBackend):
         self.api_url = f"https://api-inference.huggingface.co/models/{config.get('huggingface_model')}"
         self.headers = {"Authorization": f"Bearer {config.get('huggingface_api_key')}"}
 
-    def get_organization_suggestions(self, file_list):
-        prompt = f"Analyze the following list of files and suggest an efficient organization structure:\n\n{file_list}\n\nProposed organization:"
+    def suggest_from_prompt(self, prompt, timeout=None):
         payload = {
             "inputs": prompt,
             "parameters": {
@@ -38,7 +56,7 @@ class HuggingFaceBackend(AIBackend):
                 "temperature": config.get("temperature")
             }
         }
-        response = requests.post(self.api_url, headers=self.headers, json=payload)
+        response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=timeout or config.get("request_timeout", 60))
         return response.json()[0]["generated_text"].strip()
 
 class LocalModelBackend(AIBackend):
@@ -46,8 +64,7 @@ class LocalModelBackend(AIBackend):
         model_path = config.get("local_model_path")
         self.pipeline = pipeline("text-generation", model=model_path)
 
-    def get_organization_suggestions(self, file_list):
-        prompt = f"Analyze the following list of files and suggest an efficient organization structure:\n\n{file_list}\n\nProposed organization:"
+    def suggest_from_prompt(self, prompt, timeout=None):
         result = self.pipeline(prompt, max_new_tokens=config.get("max_tokens"), temperature=config.get("temperature"))
         return result[0]["generated_text"].strip()
 
@@ -59,15 +76,14 @@ class PerplexityBackend(AIBackend):
             "Content-Type": "application/json"
         }
 
-    def get_organization_suggestions(self, file_list):
-        prompt = f"Analyze the following list of files and suggest an efficient organization structure:\n\n{file_list}\n\nProposed organization:"
+    def suggest_from_prompt(self, prompt, timeout=None):
         payload = {
             "model": "mixtral-8x7b-instruct",
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": config.get("max_tokens"),
             "temperature": config.get("temperature")
         }
-        response = requests.post(self.api_url, headers=self.headers, json=payload)
+        response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=timeout or config.get("request_timeout", 60))
         return response.json()["choices"][0]["message"]["content"].strip()
 
 class BingBackend(AIBackend):
@@ -78,8 +94,7 @@ class BingBackend(AIBackend):
             "Ocp-Apim-Subscription-Key": config.get("bing_api_key")
         }
 
-    def get_organization_suggestions(self, file_list):
-        prompt = f"Analyze the following list of files and suggest an efficient organization structure:\n\n{file_list}\n\nProposed organization:"
+    def suggest_from_prompt(self, prompt, timeout=None):
         payload = {
             "messages": [
                 {"role": "system", "content": "You are an AI assistant that helps organize files."},
@@ -88,11 +103,152 @@ class BingBackend(AIBackend):
             "max_tokens": config.get("max_tokens"),
             "temperature": config.get("temperature")
         }
-        response = requests.post(self.api_url, headers=self.headers, json=payload)
+        response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=timeout or config.get("request_timeout", 60))
         return response.json()["choices"][0]["message"]["content"].strip()
 
-def get_ai_backend():
-    backend_type = config.get("ai_backend")
+class ClusteringBackend(AIBackend):
+    # Works on the file names directly, so hedged requests skip the prompt for it
+    uses_prompt = False
+
+    def get_organization_suggestions(self, file_list, timeout=None):
+        if not file_list:
+            return "No files to organize."
+        # A fresh clusterer per call keeps a shared backend safe across server threads
+        clusterer = FilenameClusterer(
+            clusters=config.get("cluster_count"),
+            batch_size=config.get("cluster_batch_size", 2048),
+            train_size=config.get("cluster_train_size", 20000),
+        )
+        names = [os.path.basename(file_path) for file_path in file_list]
+        labels = clusterer.fit(names).predict(names)
+        # Clusters that end up with the same name are suggested as a single folder
+        clusters = {}
+        for cluster in clusterer.name_clusters(names, labels).values():
+            merged = clusters.setdefault(cluster["name"], dict(cluster, count=0))
+            merged["count"] += cluster["count"]
+        lines = []
+        for cluster in sorted(clusters.values(), key=lambda c: c["count"], reverse=True):
+            examples = ", ".join(cluster["examples"])
+            lines.append(f"- {cluster['name']}/ ({cluster['count']} files, mostly {cluster['extension']}): e.g. {examples}")
+        return "\n".join(lines)
+
+class HedgedBackend(AIBackend):
+    def __init__(self, backend_types=None, latency_budget=None, hedge_delay=None):
+        self.backend_types = backend_types or config.get("hedged_backends", [])
+        if not self.backend_types:
+            raise ValueError("The hedged backend needs at least one entry in hedged_backends")
+        if "hedged" in self.backend_types:
+            raise ValueError("hedged_backends cannot contain the hedged backend itself")
+        self.latency_budget = latency_budget or config.get("latency_budget", 30)
+        self.hedge_delay = hedge_delay or config.get("hedge_delay")
+        self.backends = {backend_type: get_ai_backend(backend_type) for backend_type in self.backend_types}
+        self.latencies = {backend_type: deque(maxlen=config.get("latency_window", 20)) for backend_type in self.backend_types}
+        self.lock = threading.Lock()
+
+    def record_latency(self, request, seconds):
+        # Each request is recorded once, when it finishes, even if it lost the race
+        with self.lock:
+            if request["recorded"]:
+                return
+            request["recorded"] = True
+            self.latencies[request["backend_type"]].append(seconds)
+
+    def mean_latency(self, backend_type):
+        with self.lock:
+            samples = list(self.latencies[backend_type])
+        # Untried backends rank first so every provider gets measured
+        return sum(samples) / len(samples) if samples else 0.0
+
+    def ranked_backends(self):
+        return sorted(self.backend_types, key=self.mean_latency)
+
+    def delay_before_hedging(self, backend_type):
+        if self.hedge_delay:
+            return self.hedge_delay
+        with self.lock:
+            samples = sorted(self.latencies[backend_type])
+        if len(samples) < 5:
+            return 2.0
+        # Hedge once the leading backend is slower than its usual 95th percentile
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def start_request(self, backend_type, file_list, prompt, deadline):
+        request = {"backend_type": backend_type, "start": time.monotonic(), "recorded": False}
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            # The provider's own timeout is capped at the remaining budget, so a
+            # losing request gives up by the deadline instead of request_timeout
+            timeout = max(0.1, deadline - time.monotonic())
+            backend = self.backends[backend_type]
+            try:
+                if backend.uses_prompt:
+                    result = backend.suggest_from_prompt(prompt, timeout=timeout)
+                else:
+                    result = backend.get_organization_suggestions(file_list, timeout=timeout)
+            except Exception as e:
+                # Count a failure as a full budget so the backend drops in the ranking
+                self.record_latency(request, self.latency_budget)
+                future.set_exception(e)
+                return
+            self.record_latency(request, time.monotonic() - request["start"])
+            future.set_result(result)
+
+        # A dedicated thread per request means a hedge never queues behind stuck requests
+        threading.Thread(target=run, name=f"ai-{backend_type}", daemon=True).start()
+        return future, request
+
+    def get_organization_suggestions(self, file_list, timeout=None):
+        budget = min(timeout, self.latency_budget) if timeout else self.latency_budget
+        # Build the prompt once for every provider; the budget, the hedge delay and
+        # the recorded latencies then only cover the providers themselves
+        prompt = None
+        if any(backend.uses_prompt for backend in self.backends.values()):
+            prompt = self.build_prompt(file_list)
+        deadline = time.monotonic() + budget
+        queue = self.ranked_backends()
+        pending = {}
+        errors = []
+
+        def launch_next():
+            backend_type = queue.pop(0)
+            future, request = self.start_request(backend_type, file_list, prompt, deadline)
+            pending[future] = request
+            return backend_type
+
+        leader = launch_next()
+        next_hedge = time.monotonic() + self.delay_before_hedging(leader)
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wait_until = min(deadline, next_hedge) if queue else deadline
+            done, _ = wait(pending, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                backend_type = pending.pop(future)["backend_type"]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{backend_type}: {str(e)}")
+                    logger.error(f"AI backend {backend_type} failed: {str(e)}")
+                    continue
+                if result:
+                    return result
+                errors.append(f"{backend_type}: empty response")
+            if queue and (not pending or time.monotonic() >= next_hedge):
+                logger.info(f"Hedging AI request with {queue[0]}")
+                hedge = launch_next()
+                next_hedge = time.monotonic() + self.delay_before_hedging(hedge)
+        # Requests still in flight are not recorded here, since their time so far is not
+        # a latency. Their timeouts are capped at the deadline, so each one records its
+        # real latency, or the full budget on timeout, when it ends.
+        if pending:
+            raise AIBackendError(f"No AI backend answered within {budget} seconds")
+        raise AIBackendError(f"All AI backends failed: {'; '.join(errors)}")
+
+def get_ai_backend(backend_type=None):
+    backend_type = backend_type or config.get("ai_backend")
     if backend_type == "openai":
         return OpenAIBackend()
     elif backend_type == "huggingface":
@@ -103,5 +259,9 @@ def get_ai_backend():
         return PerplexityBackend()
     elif backend_type == "bing":
         return BingBackend()
+    elif backend_type == "clustering":
+        return ClusteringBackend()
+    elif backend_type == "hedged":
+        return HedgedBackend()
     else:
         raise ValueError(f"Unknown AI backend: {backend_type}")
\ No newline at end of file
@@ -0,0 +1,120 @@
+# analytics.py
+import time
+import numpy as np
+from config import config
+
+AGE_BUCKETS = [
+    ("< 1 week", 0),
+    ("1 week - 1 month", 7),
+    ("1 - 3 months", 30),
+    ("3 - 12 months", 90),
+    ("1 - 2 years", 365),
+    ("2 - 5 years", 730),
+    ("> 5 years", 1825),
+]
+
+def to_columns(scan):
+    extension_names, extension_ids = np.unique(np.array(scan["extensions"], dtype=object).astype(str), return_inverse=True)
+    return {
+        "folder_ids": np.asarray(scan["folder_ids"], dtype=np.intp),
+        "sizes": np.asarray(scan["sizes"], dtype=np.int64),
+        "mtimes": np.asarray(scan["mtimes"], dtype=np.float64),
+        "extension_ids": extension_ids.reshape(-1),
+        "extension_names": extension_names,
+        "folder_parents": np.asarray(scan["folder_parents"], dtype=np.intp),
+        "folder_depths": np.asarray(scan["folder_depths"], dtype=np.intp),
+    }
+
+def largest(values, top_n):
+    # argpartition keeps this O(n) before sorting only the selected entries
+    if len(values) > top_n:
+        candidates = np.argpartition(values, -top_n)[-top_n:]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(values[candidates])[::-1]]
+
+def folder_rollups(columns, folders, top_n):
+    folder_count = len(folders)
+    own_sizes = np.bincount(columns["folder_ids"], weights=columns["sizes"], minlength=folder_count)
+    own_counts = np.bincount(columns["folder_ids"], minlength=folder_count).astype(np.float64)
+    total_sizes = own_sizes.copy()
+    total_counts = own_counts.copy()
+    parents = columns["folder_parents"]
+    depths = columns["folder_depths"]
+    # Push totals up one level at a time, deepest first; one vectorized pass per depth
+    for depth in range(int(depths.max(initial=0)), 0, -1):
+        level = np.flatnonzero(depths == depth)
+        np.add.at(total_sizes, parents[level], total_sizes[level])
+        np.add.at(total_counts, parents[level], total_counts[level])
+    return [
+        {
+            "folder": folders[i],
+            "size": int(total_sizes[i]),
+            "files": int(total_counts[i]),
+            "own_size": int(own_sizes[i]),
+            "own_files": int(own_counts[i]),
+        }
+        for i in largest(total_sizes, top_n)
+    ]
+
+def age_histogram(ages, sizes):
+    edges = np.array([start for _, start in AGE_BUCKETS] + [np.inf])
+    counts, _ = np.histogram(ages, bins=edges)
+    size_totals, _ = np.histogram(ages, bins=edges, weights=sizes)
+    return [
+        {"age": label, "files": int(count), "size": int(size)}
+        for (label, _), count, size in zip(AGE_BUCKETS, counts, size_totals)
+    ]
+
+def extension_shares(columns, total_size, top_n):
+    extension_count = len(columns["extension_names"])
+    counts = np.bincount(columns["extension_ids"], minlength=extension_count)
+    sizes = np.bincount(columns["extension_ids"], weights=columns["sizes"], minlength=extension_count)
+    total_files = max(int(counts.sum()), 1)
+    return [
+        {
+            "extension": columns["extension_names"][i] or "(none)",
+            "files": int(counts[i]),
+            "size": int(sizes[i]),
+            "file_share": float(counts[i] / total_files),
+            "size_share": float(sizes[i] / total_size) if total_size else 0.0,
+        }
+        for i in largest(sizes, top_n)
+    ]
+
+def analyze_scan(scan, top_n=None, stale_days=None, now=None):
+    """Compute size, age and clutter statistics from a columnar scan"""
+    top_n = top_n or config.get("analytics_top_n", 20)
+    stale_days = stale_days or config.get("stale_days", 365)
+    now = now or time.time()
+
+    columns = to_columns(scan)
+    sizes = columns["sizes"]
+    ages = np.maximum((now - columns["mtimes"]) / 86400.0, 0)
+    total_size = int(sizes.sum())
+    paths = scan["paths"]
+
+    stale = np.flatnonzero(ages >= stale_days)
+    stale_order = stale[largest(sizes[stale], top_n)]
+
+    return {
+        "total_files": len(paths),
+        "total_size": total_size,
+        "total_folders": len(scan["folders"]),
+        "largest_folders": folder_rollups(columns, scan["folders"], top_n),
+        "age_histogram": age_histogram(ages, sizes),
+        "extensions": extension_shares(columns, total_size, top_n),
+        "largest_files": [
+            {"path": paths[i], "size": int(sizes[i]), "age_days": float(ages[i])}
+            for i in largest(sizes, top_n)
+        ],
+        "stale_files": {
+            "threshold_days": stale_days,
+            "files": int(len(stale)),
+            "size": int(sizes[stale].sum()),
+            "candidates": [
+                {"path": paths[i], "size": int(sizes[i]), "age_days": float(ages[i])}
+                for i in stale_order
+            ],
+        },
+    }
@@ -0,0 +1,55 @@
+# batch_organizer.py
+from concurrent.futures import ThreadPoolExecutor
+from error_handling import validate_directory
+from file_organizer import FileOrganizer
+from io_scheduler import io_scheduler as shared_io_scheduler
+from sessions import root_locks, session_manager
+from config import config
+from logger import logger
+
+class BatchOrganizer:
+    def __init__(self, roots_per_device=None, io_scheduler=None):
+        # More roots than I/O slots per device, so validation and planning overlap
+        # with another root's scan while the scheduler caps the disk itself
+        self.roots_per_device = roots_per_device or config.get("batch_roots_per_device", 4)
+        self.io_scheduler = io_scheduler or shared_io_scheduler
+
+    def organize_root(self, root, proposed_structure):
+        organizer = FileOrganizer(io_scheduler=self.io_scheduler)
+        with root_locks.write(root):
+            file_list = organizer.analyze_directory(root)
+            organizer.reorganize_files(file_list, proposed_structure)
+        moved = len(organizer.last_reorganization)
+        logger.info(f"Organized {root}: {moved} files moved")
+        job_id = session_manager.create(root, organizer)
+        return {'status': 'success', 'moved': moved, 'job_id': job_id}
+
+    def organize_roots(self, roots, proposed_structure=None):
+        results = {}
+        by_device = {}
+        for root in roots:
+            try:
+                validate_directory(root)
+                by_device.setdefault(self.io_scheduler.device_of(root), []).append(root)
+            except Exception as e:
+                results[root] = {'status': 'error', 'error': str(e)}
+
+        # One executor per device: roots on a slow disk can only occupy that
+        # device's workers, so roots on fast devices never queue behind them.
+        executors = [ThreadPoolExecutor(max_workers=min(self.roots_per_device, len(device_roots)))
+                     for device_roots in by_device.values()]
+        try:
+            futures = {}
+            for executor, device_roots in zip(executors, by_device.values()):
+                for root in device_roots:
+                    futures[root] = executor.submit(self.organize_root, root, proposed_structure)
+            for root, future in futures.items():
+                try:
+                    results[root] = future.result()
+                except Exception as e:
+                    logger.error(f"Error organizing {root}: {str(e)}")
+                    results[root] = {'status': 'error', 'error': str(e)}
+        finally:
+            for executor in executors:
+                executor.shutdown()
+        return results
@@ -3,15 +3,52 @@ import os
 
 class FileOrganizerError(Exception):
     """Base exception class for File Organizer"""
-    pass
+    summary = "file organizer error"
 
 class DirectoryNotFoundError(FileOrganizerError):
     """Raised when the specified directory is not found"""
-    pass
+    summary = "directory not found"
 
 class InvalidFileTypeError(FileOrganizerError):
     """Raised when an invalid file type is encountered"""
-    pass
+    summary = "invalid extension"
+
+class AIBackendError(FileOrganizerError):
+    """Raised when no AI backend returns a usable answer"""
+    summary = "AI backend error"
+
+class ErrorSummary:
+    """Aggregates per-file errors of a run so they are logged once per error class"""
+
+    def __init__(self, operation, max_samples=5):
+        self.operation = operation
+        self.max_samples = max_samples
+        self.errors = {}
+
+    def add(self, error, file_path):
+        error_class = type(error).__name__
+        entry = self.errors.get(error_class)
+        if entry is None:
+            entry = self.errors[error_class] = {
+                "summary": getattr(error, "summary", error_class),
+                "count": 0,
+                "samples": [],
+            }
+        entry["count"] += 1
+        if len(entry["samples"]) < self.max_samples:
+            entry["samples"].append(f"{file_path}: {str(error)}")
+
+    def log(self, logger):
+        for error_class, entry in self.errors.items():
+            logger.error(
+                f"{self.operation}: {entry['count']:,} files skipped: {entry['summary']} "
+                f"(e.g. {'; '.join(entry['samples'])})",
+                extra={
+                    "error_class": f"{self.operation}:{error_class}",
+                    "count": entry["count"],
+                    "samples": entry["samples"],
+                },
+            )
 
 def validate_directory(directory):
     if not os.path.isdir(directory):
@@ -23,7 +60,8 @@ def validate_file_type(file_path, allowed_extensions):
         raise InvalidFileTypeError(f"The file '{file_path}' has an invalid extension.")
 
 def handle_error(error, logger):
+    extra = {"error_class": type(error).__name__}
     if isinstance(error, FileOrganizerError):
-        logger.error(str(error))
+        logger.error(str(error), extra=extra)
     else:
-        logger.error(f"An unexpected error occurred: {str(error)}")
\ No newline at end of file
+        logger.error(f"An unexpected error occurred: {str(error)}", extra=extra)
\ No newline at end of file
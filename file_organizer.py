@@ -1,13 +1,18 @@
 # file_organizer.py
 import os
 import shutil
-from error_handling import validate_directory, validate_file_type
+from error_handling import validate_directory, validate_file_type, ErrorSummary
+from io_scheduler import io_scheduler as shared_io_scheduler
 from config import config
 from logger import logger
 
 class FileOrganizer:
-    def __init__(self):
+    def __init__(self, io_scheduler=None):
         self.last_reorganization = []
+        self.io_scheduler = io_scheduler or shared_io_scheduler
+
+    def io_slot(self, directory):
+        return self.io_scheduler.slot(directory)
 
     def get_directory_structure(self, directory):
         structure = {}
@@ -42,33 +47,100 @@ class FileOrganizer:
     def analyze_directory(self, directory):
         validate_directory(directory)
         file_list = []
-        for root, _, files in os.walk(directory):
+        walker = os.walk(directory)
+        while True:
+            # Hold the device slot only while listing a single directory
+            with self.io_slot(directory):
+                entry = next(walker, None)
+            if entry is None:
+                break
+            root, _, files = entry
             for file in files:
                 file_path = os.path.join(root, file)
                 file_list.append(file_path)
         return file_list
 
+    def scan_directory(self, directory):
+        # Columnar scan used for analytics: one entry per file, folders referenced by index.
+        # Files and folders are classified and ordered the way os.walk does it.
+        validate_directory(directory)
+        scan = {"paths": [], "folder_ids": [], "sizes": [], "mtimes": [], "extensions": [],
+                "folders": [], "folder_parents": [], "folder_depths": []}
+        errors = ErrorSummary("scan")
+        stack = [(directory, -1, 0)]
+        while stack:
+            folder, parent, depth = stack.pop()
+            try:
+                with self.io_slot(directory):
+                    entries = list(os.scandir(folder))
+            except OSError as e:
+                errors.add(e, folder)
+                continue
+            folder_id = len(scan["folders"])
+            scan["folders"].append(os.path.relpath(folder, directory))
+            scan["folder_parents"].append(parent)
+            scan["folder_depths"].append(depth)
+            subfolders = []
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subfolders.append((entry.path, folder_id, depth + 1))
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        scan["paths"].append(entry.path)
+                        scan["folder_ids"].append(folder_id)
+                        scan["sizes"].append(stat.st_size)
+                        scan["mtimes"].append(stat.st_mtime)
+                        scan["extensions"].append(os.path.splitext(entry.name)[1].lower())
+                except OSError as e:
+                    errors.add(e, entry.path)
+            # Reversed so folders are popped in listing order, as in a top-down walk
+            stack.extend(reversed(subfolders))
+        errors.log(logger)
+        return scan
+
+    def structure_from_scan(self, scan):
+        # Same shape as get_directory_structure, built from a scan instead of a second walk
+        folder_files = [[] for _ in scan["folders"]]
+        for file_path, folder_id in zip(scan["paths"], scan["folder_ids"]):
+            folder_files[folder_id].append(os.path.basename(file_path))
+        structure = {}
+        for folder, files in zip(scan["folders"], folder_files):
+            current = structure
+            for part in folder.split(os.sep):
+                current = current.setdefault(part, {})
+            current['files'] = files
+        return structure
+
     def preview_reorganization(self, file_list, proposed_structure):
         preview = []
+        errors = ErrorSummary("preview")
+        allowed_extensions = config.get("allowed_extensions")
         for file_path in file_list:
             try:
-                validate_file_type(file_path, config.get("allowed_extensions"))
+                validate_file_type(file_path, allowed_extensions)
                 new_location = self.get_new_location(file_path, proposed_structure)
                 preview.append((file_path, new_location))
             except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
+                errors.add(e, file_path)
+        errors.log(logger)
         return preview
 
     def reorganize_files(self, file_list, proposed_structure):
         self.last_reorganization = []
+        errors = ErrorSummary("reorganize")
+        allowed_extensions = config.get("allowed_extensions")
         for file_path in file_list:
             try:
-                validate_file_type(file_path, config.get("allowed_extensions"))
+                validate_file_type(file_path, allowed_extensions)
                 new_location = self.get_new_location(file_path, proposed_structure)
-                self.last_reorganization.append((file_path, new_location))
                 self.move_file(file_path, new_location)
+                # Only moves that happened are counted and undone
+                self.last_reorganization.append((file_path, new_location))
             except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
+                errors.add(e, file_path)
+        errors.log(logger)
 
     def get_new_location(self, file_path, proposed_structure):
         # This is a simplified implementation. In a real-world scenario,
@@ -81,16 +153,21 @@ class FileOrganizer:
         return file_path
 
     def move_file(self, source, destination):
-        os.makedirs(os.path.dirname(destination), exist_ok=True)
-        shutil.move(source, destination)
+        with self.io_slot(os.path.dirname(source)):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.move(source, destination)
 
     def undo_last_reorganization(self):
+        errors = ErrorSummary("undo")
+        restored = 0
         for old_path, new_path in reversed(self.last_reorganization):
             try:
                 self.move_file(new_path, old_path)
-                logger.info(f"Moved {new_path} back to {old_path}")
+                restored += 1
             except Exception as e:
-                logger.error(f"Error undoing move for {new_path}: {str(e)}")
+                errors.add(e, new_path)
+        logger.info(f"Moved {restored:,} files back to their original locations")
+        errors.log(logger)
         self.last_reorganization = []
 
 file_organizer = FileOrganizer()
\ No newline at end of file
@@ -0,0 +1,132 @@
+# filename_clustering.py
+import os
+import re
+from collections import Counter
+import numpy as np
+
+TOKEN = re.compile(r"[a-z]{3,}")
+
+def encode_names(names, width):
+    encoded = np.array([name.lower().encode("utf-8", "ignore")[:width] for name in names], dtype=f"S{width}")
+    return encoded.view(np.uint8).reshape(len(names), width)
+
+def hash_ngrams(codes, n, bits):
+    """Hash every character n-gram of each row; positions past the end of a name get the index 2**bits"""
+    codes = codes.astype(np.uint32)
+    positions = codes.shape[1] - n + 1
+    hashed = np.zeros((codes.shape[0], positions), dtype=np.uint32)
+    for offset in range(n):
+        hashed = hashed * np.uint32(257) + codes[:, offset:offset + positions]
+    hashed = (hashed * np.uint32(2654435761)) >> np.uint32(32 - bits)
+    # Names are zero padded at the end, so an n-gram is valid when its last byte is set
+    hashed[codes[:, n - 1:] == 0] = 1 << bits
+    return hashed.astype(np.intp)
+
+def dense_features(hashed, dimensions, idf):
+    rows = np.repeat(np.arange(hashed.shape[0]), hashed.shape[1])
+    counts = np.bincount(rows * (dimensions + 1) + hashed.ravel(), minlength=hashed.shape[0] * (dimensions + 1))
+    features = counts.reshape(hashed.shape[0], dimensions + 1)[:, :dimensions].astype(np.float32)
+    if idf is not None:
+        features *= idf
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return features / norms
+
+class FilenameClusterer:
+    """Groups filenames with hashed character n-gram TF-IDF and mini-batch k-means"""
+
+    def __init__(self, clusters=None, ngram=3, bits=10, width=64, batch_size=2048,
+                 train_size=20000, iterations=3, seed=0):
+        self.clusters = clusters
+        self.ngram = ngram
+        self.bits = bits
+        self.dimensions = 1 << bits
+        self.width = width
+        self.batch_size = batch_size
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.idf = None
+        self.centers = None
+
+    def hash_names(self, names):
+        return hash_ngrams(encode_names(names, self.width), self.ngram, self.bits)
+
+    def fit(self, names):
+        # Both the IDF weights and the centers are estimated on a fixed-size sample,
+        # so training cost does not grow with the number of files
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(names), self.train_size)
+        sample = rng.choice(len(names), size=sample_size, replace=False)
+        hashed = self.hash_names([names[i] for i in sample])
+
+        document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for start in range(0, sample_size, self.batch_size):
+            document_frequency += (dense_features(hashed[start:start + self.batch_size], self.dimensions, None) > 0).sum(axis=0)
+        self.idf = (np.log((1 + sample_size) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        k = self.clusters or int(min(64, max(2, np.sqrt(len(names) / 2))))
+        k = min(k, sample_size)
+        self.centers = dense_features(hashed[rng.choice(sample_size, size=k, replace=False)], self.dimensions, self.idf)
+        counts = np.zeros(k, dtype=np.float32)
+        for _ in range(self.iterations):
+            for start in range(0, sample_size, self.batch_size):
+                features = dense_features(hashed[start:start + self.batch_size], self.dimensions, self.idf)
+                labels = np.argmax(features @ self.centers.T, axis=1)
+                one_hot = np.zeros((len(labels), k), dtype=np.float32)
+                one_hot[np.arange(len(labels)), labels] = 1
+                batch_counts = one_hot.sum(axis=0)
+                new_counts = counts + batch_counts
+                updated = new_counts > 0
+                # Running mean update: each center moves with a per-center learning rate of 1 / count
+                self.centers[updated] = ((self.centers[updated] * counts[updated, None] + (one_hot.T @ features)[updated])
+                                         / new_counts[updated, None])
+                counts = new_counts
+                norms = np.linalg.norm(self.centers, axis=1, keepdims=True)
+                norms[norms == 0] = 1
+                self.centers /= norms
+        return self
+
+    def predict(self, names):
+        # Accumulate scores one n-gram position at a time: each step gathers a
+        # (batch x clusters) slice, so no (batch x positions x clusters) array is
+        # built. Names are zero padded at the end, so positions past the longest
+        # name in the batch are skipped. Row norms do not change the argmax.
+        weights = np.vstack([self.idf[:, None] * self.centers.T,
+                             np.zeros((1, len(self.centers)), dtype=np.float32)])
+        labels = np.empty(len(names), dtype=np.intp)
+        for start in range(0, len(names), self.batch_size):
+            hashed = self.hash_names(names[start:start + self.batch_size])
+            positions = int((hashed < self.dimensions).sum(axis=1).max(initial=0))
+            scores = np.zeros((len(hashed), len(self.centers)), dtype=np.float32)
+            for position in range(positions):
+                scores += weights[hashed[:, position]]
+            labels[start:start + len(hashed)] = np.argmax(scores, axis=1)
+        return labels
+
+    def name_clusters(self, names, labels, sample_size=200):
+        cluster_names = {}
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        for members in np.split(order, boundaries):
+            if not len(members):
+                continue
+            tokens = Counter()
+            extensions = Counter()
+            for index in members[:sample_size]:
+                stem, ext = os.path.splitext(names[index].lower())
+                tokens.update(TOKEN.findall(stem))
+                extensions[ext or "(none)"] += 1
+            top_tokens = [token for token, _ in tokens.most_common(2)]
+            top_extension = extensions.most_common(1)[0][0]
+            if top_tokens:
+                name = " ".join(top_tokens).title()
+            else:
+                name = f"{top_extension.lstrip('.').upper()} Files"
+            cluster_names[int(labels[members[0]])] = {
+                "name": name,
+                "count": len(members),
+                "extension": top_extension,
+                "examples": [names[index] for index in members[:3]],
+            }
+        return cluster_names
@@ -0,0 +1,41 @@
+# io_scheduler.py
+import os
+import threading
+from contextlib import contextmanager
+from config import config
+
+class IOScheduler:
+    """Limits in-flight scan and move operations per underlying device (st_dev)"""
+
+    def __init__(self, max_in_flight_per_device=None):
+        self.max_in_flight_per_device = max_in_flight_per_device or config.get("io_max_in_flight_per_device", 2)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._devices = {}
+
+    def device_of(self, directory):
+        # Callers pass directories, so moving many files costs one stat per folder
+        with self._lock:
+            device = self._devices.get(directory)
+        if device is None:
+            device = os.stat(directory).st_dev
+            with self._lock:
+                self._devices[directory] = device
+        return device
+
+    def _semaphore_for(self, device):
+        with self._lock:
+            semaphore = self._semaphores.get(device)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_in_flight_per_device)
+                self._semaphores[device] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, directory):
+        with self._semaphore_for(self.device_of(directory)):
+            yield
+
+# Shared by every organizer in the process so the per-device limit holds across
+# concurrent requests, the GUI and watch mode
+io_scheduler = IOScheduler()
@@ -1,7 +1,78 @@
 # logger.py
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+import time
 from config import config
 
+class JsonFormatter(logging.Formatter):
+    extra_fields = ("error_class", "count", "samples", "suppressed")
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in self.extra_fields:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as-is so formatting happens on the listener thread and exc_info survives"""
+
+    def prepare(self, record):
+        return record
+
+class WorkerQueueHandler(logging.handlers.QueueHandler):
+    """Sends records from child processes to the parent; tracebacks are rendered because they cannot be pickled"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class ErrorClassRateLimiter(logging.Filter):
+    """Lets through at most `rate` warnings or errors per error class every `per` seconds"""
+
+    def __init__(self, rate, per):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        # Records without an explicit error class are grouped by call site
+        error_class = getattr(record, "error_class", None) or f"{record.pathname}:{record.lineno}"
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated, suppressed = self.buckets.get(error_class, (self.rate, now, 0))
+            tokens = min(self.rate, tokens + (now - updated) * self.rate / self.per)
+            if tokens < 1:
+                self.buckets[error_class] = (tokens, now, suppressed + 1)
+                return False
+            self.buckets[error_class] = (tokens - 1, now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
 def setup_logger():
     logger = logging.getLogger("FileOrganizer")
     logger.setLevel(config.get("log_level", "INFO"))
@@ -9,13 +80,47 @@ def setup_logger():
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
     file_handler = logging.FileHandler("file_organizer.log")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonFormatter())
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    return logger
+    # Callers only enqueue records; formatting and I/O happen on the listener thread
+    log_queue = queue.Queue(-1)
+    queue_handler = LogQueueHandler(log_queue)
+    queue_handler.addFilter(create_rate_limiter())
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return logger, listener
+
+def create_rate_limiter():
+    return ErrorClassRateLimiter(config.get("log_rate_limit", 20), config.get("log_rate_period", 60))
+
+def create_worker_log_queue(context):
+    # Child processes log into this queue and the parent writes with its own handlers
+    worker_queue = context.Queue(-1)
+    worker_listener = logging.handlers.QueueListener(worker_queue, *listener.handlers,
+                                                     respect_handler_level=True)
+    worker_listener.start()
+    atexit.register(worker_listener.stop)
+    return worker_queue
+
+def configure_worker_logging(worker_queue):
+    # Called in a child process: drop the handlers set up on import and forward to the parent
+    atexit.unregister(listener.stop)
+    listener.stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    for handler in listener.handlers:
+        handler.close()
+    worker_handler = WorkerQueueHandler(worker_queue)
+    worker_handler.addFilter(create_rate_limiter())
+    logger.addHandler(worker_handler)
 
-logger = setup_logger()
\ No newline at end of file
+logger, listener = setup_logger()
@@ -1,38 +1,175 @@
 # plugin_system.py
+import ast
 import importlib
+import multiprocessing
 import os
-from logger import logger
+import threading
+import time
+from config import config
+from logger import logger, configure_worker_logging, create_worker_log_queue
+
+def _current_address_space():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+def _init_worker(max_memory_mb, log_queue):
+    configure_worker_logging(log_queue)
+    _limit_memory(max_memory_mb)
+
+def _limit_memory(max_memory_mb):
+    try:
+        import resource
+    except ImportError:
+        return  # Memory limits are only available on POSIX
+    # Cap what the plugin may allocate on top of the worker's own baseline
+    limit = _current_address_space() + max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _run_plugin(module_name, directory, moved_files, batched):
+    # Runs inside a pool worker, so the plugin is only imported there
+    module = importlib.import_module(f"plugins.{module_name}")
+    plugin_info = module.register_plugin()
+    if batched:
+        return plugin_info["execute"](directory, moved_files)
+    return plugin_info["execute"](directory)
 
 class PluginSystem:
     def __init__(self):
         self.plugins = {}
+        self.plugin_dir = "plugins"
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._log_queue = None
+
+    def read_plugin_manifest(self, path):
+        # Read HOOKS and DESCRIPTION without executing the plugin module
+        with open(path, "r") as f:
+            tree = ast.parse(f.read(), filename=path)
+        manifest = {"description": ast.get_docstring(tree) or ""}
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                name = node.targets[0].id
+                if name in ("HOOKS", "DESCRIPTION"):
+                    manifest[name.lower()] = ast.literal_eval(node.value)
+        return manifest
 
     def load_plugins(self):
-        plugin_dir = "plugins"
-        if not os.path.exists(plugin_dir):
-            os.makedirs(plugin_dir)
+        if not os.path.exists(self.plugin_dir):
+            os.makedirs(self.plugin_dir)
 
-        for filename in os.listdir(plugin_dir):
+        for filename in os.listdir(self.plugin_dir):
             if filename.endswith(".py") and not filename.startswith("__"):
                 module_name = filename[:-3]
                 try:
-                    module = importlib.import_module(f"plugins.{module_name}")
-                    if hasattr(module, "register_plugin"):
-                        plugin_info = module.register_plugin()
-                        self.plugins[module_name] = plugin_info
-                        logger.logger.info(f"Loaded plugin: {module_name}")
+                    manifest = self.read_plugin_manifest(os.path.join(self.plugin_dir, filename))
+                    if "hooks" in manifest:
+                        plugin_info = {
+                            "description": manifest["description"],
+                            "hooks": list(manifest["hooks"]),
+                            "batched": True,
+                        }
+                    else:
+                        # Legacy plugins do not declare hooks, so import them to read their type
+                        module = importlib.import_module(f"plugins.{module_name}")
+                        if not hasattr(module, "register_plugin"):
+                            continue
+                        registered = module.register_plugin()
+                        plugin_info = {
+                            "description": registered.get("description", ""),
+                            "hooks": [registered["type"]] if registered.get("type") else [],
+                            "batched": False,
+                        }
+                    self.plugins[module_name] = plugin_info
+                    logger.info(f"Discovered plugin: {module_name}")
                 except Exception as e:
                     logger.error(f"Error loading plugin {module_name}: {str(e)}")
 
     def get_plugin(self, name):
         return self.plugins.get(name)
 
-    def execute_plugin(self, name, *args, **kwargs):
+    def get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawn a fresh interpreter instead of forking the GUI process and its threads.
+                # Workers re-import the entry script, which is why main.py imports nothing itself.
+                context = multiprocessing.get_context("spawn")
+                if self._log_queue is None:
+                    self._log_queue = create_worker_log_queue(context)
+                self._pool = context.Pool(
+                    processes=config.get("plugin_workers", 2),
+                    initializer=_init_worker,
+                    initargs=(config.get("plugin_max_memory_mb", 512), self._log_queue),
+                )
+            return self._pool
+
+    def reset_pool(self):
+        # A hung worker cannot be cancelled individually, so replace the pool
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+
+    def submit_plugin(self, name, directory, moved_files=None):
         plugin = self.get_plugin(name)
-        if plugin and "execute" in plugin:
-            return plugin["execute"](*args, **kwargs)
+        if not plugin:
+            logger.error(f"Plugin {name} not found")
+            return None
+
+        moved_files = moved_files or []
+        batch_size = config.get("plugin_batch_size", 1000)
+        if plugin["batched"] and moved_files:
+            batches = [moved_files[i:i + batch_size] for i in range(0, len(moved_files), batch_size)]
         else:
-            logger.error(f"Plugin {name} not found or does not have an execute function")
+            batches = [moved_files]
+
+        pool = self.get_pool()
+        return [pool.apply_async(_run_plugin, (name, directory, batch, plugin["batched"]))
+                for batch in batches]
+
+    def collect_results(self, name, pending, deadline):
+        # Every batch waits against the same deadline, so a plugin with many
+        # batches cannot hold the caller for more than plugin_timeout in total
+        results = []
+        for result in pending:
+            try:
+                value = result.get(timeout=max(0, deadline - time.monotonic()))
+                if value:
+                    results.append(value)
+            except multiprocessing.TimeoutError:
+                logger.error(f"Plugin {name} timed out after {config.get('plugin_timeout', 30)} seconds")
+                self.reset_pool()
+                break
+            except Exception as e:
+                logger.error(f"Plugin {name} failed: {type(e).__name__}: {str(e)}")
+        if not results:
             return None
+        return results[0] if len(results) == 1 else results
+
+    def execute_plugin(self, name, directory, moved_files=None):
+        deadline = time.monotonic() + config.get("plugin_timeout", 30)
+        pending = self.submit_plugin(name, directory, moved_files)
+        if pending is None:
+            return None
+        return self.collect_results(name, pending, deadline)
+
+    def run_hook(self, hook, directory, moved_files=None):
+        # Submit every plugin's batches before waiting on any, so plugins run
+        # side by side in the pool and share one deadline for the whole hook
+        deadline = time.monotonic() + config.get("plugin_timeout", 30)
+        submitted = {}
+        for name, plugin_info in self.plugins.items():
+            if hook in plugin_info["hooks"]:
+                pending = self.submit_plugin(name, directory, moved_files)
+                if pending is not None:
+                    submitted[name] = pending
+        results = {}
+        for name, pending in submitted.items():
+            result = self.collect_results(name, pending, deadline)
+            if result:
+                results[name] = result
+        return results
 
-plugin_system = PluginSystem()
\ No newline at end of file
+plugin_system = PluginSystem()
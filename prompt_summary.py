@@ -0,0 +1,87 @@
+# prompt_summary.py
+import os
+import re
+from collections import Counter, defaultdict
+from config import config
+
+FILENAME_PATTERNS = [
+    ("date", re.compile(r"(19|20)\d{2}[-_.]?(0[1-9]|1[0-2])[-_.]?(0[1-9]|[12]\d|3[01])")),
+    ("camera", re.compile(r"^(IMG|DSC|DSCN|DSCF|PXL|VID|MVI|GOPR|GH\d{2}|MOV)[_-]?\d+", re.IGNORECASE)),
+    ("screenshot", re.compile(r"screen ?shot|screenshot", re.IGNORECASE)),
+    ("version", re.compile(r"([_ -]v\d+(\.\d+)*|[_ -]final|[_ -]draft)$", re.IGNORECASE)),
+    ("copy", re.compile(r"( \(\d+\)| - copy| copy( \d+)?)$", re.IGNORECASE)),
+]
+
+DIGITS = re.compile(r"\d+")
+
+def summarize_files(file_list, top_n=None, sample_size=None):
+    """Reduce a scan to a compact profile whose size depends on distinct patterns, not file count"""
+    top_n = top_n or config.get("prompt_top_n", 15)
+    sample_size = sample_size or config.get("prompt_sample_size", 15)
+    if not file_list:
+        return "No files found."
+
+    try:
+        base = os.path.commonpath(file_list)
+    except ValueError:
+        base = ""
+    if base in file_list:
+        base = os.path.dirname(base)
+    prefix = base if base.endswith(os.sep) else base + os.sep
+    if base and all(file_path.startswith(prefix) for file_path in file_list):
+        # Slice off the common prefix; os.path.relpath would resolve both paths for every file
+        relative_paths = [file_path[len(prefix):] for file_path in file_list]
+    elif base:
+        # commonpath normalizes, so unnormalized paths such as ./a/b still need relpath
+        relative_paths = [os.path.relpath(file_path, base) for file_path in file_list]
+    else:
+        relative_paths = file_list
+
+    extensions = Counter()
+    directories = Counter()
+    directory_extensions = defaultdict(Counter)
+    patterns = Counter()
+    templates = Counter()
+    for relative in relative_paths:
+        folder, name = os.path.split(relative)
+        stem, ext = os.path.splitext(name)
+        ext = ext.lower() or "(none)"
+        folder = folder or "."
+        extensions[ext] += 1
+        directories[folder] += 1
+        directory_extensions[folder][ext] += 1
+        for pattern_name, pattern in FILENAME_PATTERNS:
+            if pattern.search(stem):
+                patterns[pattern_name] += 1
+        # Collapse digit runs so IMG_0001 and IMG_0002 share a template
+        templates[DIGITS.sub("#", stem) + ext] += 1
+
+    lines = [f"Root: {base or '(mixed)'}", f"Total files: {len(file_list)}", f"Total folders: {len(directories)}", ""]
+
+    lines.append("Extensions (count):")
+    lines.extend(f"  {ext}: {count}" for ext, count in extensions.most_common(top_n))
+    if len(extensions) > top_n:
+        lines.append(f"  ... {len(extensions) - top_n} more extensions")
+
+    lines.append("Largest folders (count, main extensions):")
+    for folder, count in directories.most_common(top_n):
+        main_extensions = ", ".join(ext for ext, _ in directory_extensions[folder].most_common(3))
+        lines.append(f"  {folder}: {count} ({main_extensions})")
+    if len(directories) > top_n:
+        lines.append(f"  ... {len(directories) - top_n} more folders")
+
+    if patterns:
+        lines.append("Filename patterns (count):")
+        lines.extend(f"  {name}: {count}" for name, count in patterns.most_common())
+
+    repeated = [(template, count) for template, count in templates.most_common(top_n) if count > 1]
+    if repeated:
+        lines.append("Common filename templates (# = digits):")
+        lines.extend(f"  {template}: {count}" for template, count in repeated)
+
+    # Evenly spaced sample so the prompt is deterministic for the same scan
+    step = max(1, len(file_list) // sample_size)
+    lines.append("Sample paths:")
+    lines.extend(f"  {path}" for path in relative_paths[::step][:sample_size])
+
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+# sessions.py
+import os
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from config import config
+from logger import logger
+
+def normalize_root(directory):
+    return os.path.realpath(os.path.abspath(directory))
+
+def roots_overlap(first, second):
+    # A root overlaps with itself, its ancestors and its descendants
+    if first == second:
+        return True
+    first_prefix = first if first.endswith(os.sep) else first + os.sep
+    second_prefix = second if second.endswith(os.sep) else second + os.sep
+    return first.startswith(second_prefix) or second.startswith(first_prefix)
+
+class RootLockManager:
+    """Read-write locks per root: analyses run in parallel, applies to overlapping roots are serialized"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = Counter()
+        self.writers = set()
+        self.waiting_writers = Counter()
+
+    def conflicts(self, root, roots):
+        return any(roots_overlap(root, other) for other in roots)
+
+    @contextmanager
+    def read(self, directory):
+        root = normalize_root(directory)
+        with self.condition:
+            # Waiting writers block new readers so applies are not starved
+            while self.conflicts(root, self.writers) or self.conflicts(root, self.waiting_writers):
+                self.condition.wait()
+            self.readers[root] += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers[root] -= 1
+                if not self.readers[root]:
+                    del self.readers[root]
+                self.condition.notify_all()
+
+    @contextmanager
+    def write(self, directory):
+        root = normalize_root(directory)
+        with self.condition:
+            self.waiting_writers[root] += 1
+            try:
+                while self.conflicts(root, self.writers) or self.conflicts(root, self.readers):
+                    self.condition.wait()
+            finally:
+                self.waiting_writers[root] -= 1
+                if not self.waiting_writers[root]:
+                    del self.waiting_writers[root]
+            self.writers.add(root)
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writers.discard(root)
+                self.condition.notify_all()
+
+class SessionManager:
+    """Keeps one FileOrganizer per job so concurrent clients do not share undo state"""
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions or config.get("max_sessions", 100)
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        # Remember recently evicted jobs so undo can say they expired rather than never existed
+        self.evicted = OrderedDict()
+        # Jobs whose undo is running; they are out of sessions until it finishes
+        self.claimed = set()
+
+    def create(self, directory, organizer):
+        # Only register completed jobs, so failed ones never take a slot
+        job_id = uuid.uuid4().hex
+        session = {"directory": directory, "organizer": organizer}
+        evicted = []
+        with self.lock:
+            self.sessions[job_id] = session
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, evicted_session = self.sessions.popitem(last=False)
+                self.evicted[evicted_id] = evicted_session["directory"]
+                evicted.append((evicted_id, evicted_session["directory"]))
+            while len(self.evicted) > self.max_sessions:
+                self.evicted.popitem(last=False)
+        for evicted_id, evicted_directory in evicted:
+            logger.warning(f"Undo history for job {evicted_id} ({evicted_directory}) was dropped; "
+                           f"only the last {self.max_sessions} jobs can be undone")
+        return job_id
+
+    def is_expired(self, job_id):
+        with self.lock:
+            return job_id in self.evicted
+
+    def is_claimed(self, job_id):
+        with self.lock:
+            return job_id in self.claimed
+
+    def claim(self, job_id):
+        # Take the session out under the lock so only one undo can run per job
+        with self.lock:
+            session = self.sessions.pop(job_id, None)
+            if session is not None:
+                self.claimed.add(job_id)
+            return session
+
+    def release(self, job_id, session=None):
+        # Pass the session back when its undo failed so the job can be retried
+        with self.lock:
+            self.claimed.discard(job_id)
+            if session is not None:
+                self.sessions[job_id] = session
+
+root_locks = RootLockManager()
+session_manager = SessionManager()
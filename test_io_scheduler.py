@@ -0,0 +1,74 @@
+# test_io_scheduler.py
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from batch_organizer import BatchOrganizer
+from file_organizer import FileOrganizer
+from io_scheduler import IOScheduler, io_scheduler
+from config import config
+
+class RecordingScheduler(IOScheduler):
+    """Counts callers waiting for and holding a slot, and holds each slot briefly so they overlap"""
+
+    def __init__(self, max_in_flight_per_device):
+        super().__init__(max_in_flight_per_device)
+        self.counter_lock = threading.Lock()
+        self.requested = 0
+        self.holding = 0
+        self.peak_requested = 0
+        self.peak_holding = 0
+
+    def slot(self, directory):
+        scheduler = self
+
+        class RecordedSlot:
+            def __enter__(self):
+                with scheduler.counter_lock:
+                    scheduler.requested += 1
+                    scheduler.peak_requested = max(scheduler.peak_requested, scheduler.requested)
+                self.inner = IOScheduler.slot(scheduler, directory)
+                self.inner.__enter__()
+                with scheduler.counter_lock:
+                    scheduler.holding += 1
+                    scheduler.peak_holding = max(scheduler.peak_holding, scheduler.holding)
+                time.sleep(0.05)
+
+            def __exit__(self, *exc_info):
+                with scheduler.counter_lock:
+                    scheduler.holding -= 1
+                    scheduler.requested -= 1
+                return self.inner.__exit__(*exc_info)
+
+        return RecordedSlot()
+
+class IOSchedulerTest(unittest.TestCase):
+    def test_roots_on_one_device_wait_for_a_slot(self):
+        scheduler = RecordingScheduler(max_in_flight_per_device=2)
+        with tempfile.TemporaryDirectory() as parent:
+            roots = []
+            for index in range(6):
+                root = os.path.join(parent, f"root{index}")
+                os.makedirs(root)
+                with open(os.path.join(root, f"notes{index}.txt"), "w") as f:
+                    f.write("notes")
+                roots.append(root)
+
+            with mock.patch.dict(config.config, {"allowed_extensions": [".txt"]}):
+                results = BatchOrganizer(roots_per_device=6, io_scheduler=scheduler).organize_roots(roots)
+
+            for root in roots:
+                self.assertEqual(results[root]["status"], "success")
+                self.assertEqual(results[root]["moved"], 1)
+        # All six roots asked for the device at once, but only two held it
+        self.assertGreater(scheduler.peak_requested, 2)
+        self.assertEqual(scheduler.peak_holding, 2)
+
+    def test_organizers_share_the_process_scheduler(self):
+        self.assertIs(FileOrganizer().io_scheduler, io_scheduler)
+        self.assertIs(BatchOrganizer().io_scheduler, io_scheduler)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+# watch_mode.py
+import ctypes
+import ctypes.util
+import heapq
+import os
+import select
+import struct
+import sys
+import time
+from error_handling import validate_directory, validate_file_type, ErrorSummary
+from file_organizer import FileOrganizer
+from sessions import root_locks
+from config import config
+from logger import logger
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+class Inotify:
+    """Minimal ctypes wrapper around the Linux inotify API"""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {path}: {os.strerror(errno)}")
+        return wd
+
+    def read_events(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class DirectoryWatcher:
+    """Organizes new or changed files under a root incrementally as they settle"""
+
+    def __init__(self, root, organizer=None, debounce_seconds=None, stable_seconds=None):
+        self.root = root
+        self.organizer = organizer or FileOrganizer()
+        self.debounce_seconds = debounce_seconds or config.get("watch_debounce_seconds", 2)
+        self.stable_seconds = stable_seconds or config.get("watch_stable_seconds", 2)
+        self.batch_size = config.get("watch_batch_size", 500)
+        self.inotify = None
+        self.watches = {}
+        # path -> (time of next check, (size, mtime_ns) seen at the last check)
+        self.pending = {}
+        # Min-heap of (time of next check, path) with at most one live entry per pending path
+        self.due = []
+        self.running = False
+
+    def watch_tree(self, directory, enqueue_files=False):
+        for root, _, files in os.walk(directory):
+            try:
+                self.watches[self.inotify.add_watch(root)] = root
+            except OSError as e:
+                logger.error(str(e))
+                continue
+            if enqueue_files:
+                # A directory moved in from elsewhere brings files without events
+                for file in files:
+                    self.schedule(os.path.join(root, file))
+
+    def is_organized(self, file_path):
+        new_location = self.organizer.get_new_location(file_path, None)
+        if new_location == file_path:
+            return True
+        return os.path.basename(os.path.dirname(file_path)) == os.path.basename(os.path.dirname(new_location))
+
+    def schedule(self, file_path):
+        if self.is_organized(file_path):
+            return
+        if file_path not in self.pending:
+            heapq.heappush(self.due, (time.monotonic() + self.debounce_seconds, file_path))
+        # A file already in the heap is rescheduled lazily when its entry comes due
+        self.pending[file_path] = (time.monotonic() + self.debounce_seconds, None)
+
+    def handle_event(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, so rescan once to pick up files and folders they described
+            logger.warning("inotify queue overflowed; rescanning watched directories")
+            self.watch_tree(self.root, enqueue_files=True)
+            return
+        directory = self.watches.get(wd)
+        if mask & IN_IGNORED:
+            self.watches.pop(wd, None)
+            return
+        if directory is None or not name:
+            return
+
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.watch_tree(path, enqueue_files=True)
+        elif mask & (IN_MOVED_FROM | IN_DELETE):
+            self.pending.pop(path, None)
+        else:
+            self.schedule(path)
+
+    def collect_ready(self):
+        now = time.monotonic()
+        ready = []
+        while self.due and self.due[0][0] <= now and len(ready) < self.batch_size:
+            _, file_path = heapq.heappop(self.due)
+            entry = self.pending.get(file_path)
+            if entry is None:
+                continue  # Moved away or deleted since it was scheduled
+            check_at, last_signature = entry
+            if check_at > now:
+                heapq.heappush(self.due, (check_at, file_path))
+                continue
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                del self.pending[file_path]
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if signature == last_signature:
+                del self.pending[file_path]
+                ready.append(file_path)
+            else:
+                self.pending[file_path] = (now + self.stable_seconds, signature)
+                heapq.heappush(self.due, (now + self.stable_seconds, file_path))
+        return ready
+
+    def apply(self, file_list):
+        allowed_extensions = config.get("allowed_extensions")
+        errors = ErrorSummary("watch")
+        batch = []
+        for file_path in file_list:
+            try:
+                validate_file_type(file_path, allowed_extensions)
+                batch.append(file_path)
+            except Exception as e:
+                errors.add(e, file_path)
+        errors.log(logger)
+        if batch:
+            with root_locks.write(self.root):
+                self.organizer.reorganize_files(batch, None)
+            logger.info(f"Watch mode organized {len(batch)} files under {self.root}")
+
+    def next_timeout(self):
+        if not self.due:
+            return 1.0
+        delay = self.due[0][0] - time.monotonic()
+        return max(0.0, min(delay, 1.0))
+
+    def run(self):
+        validate_directory(self.root)
+        self.inotify = Inotify()
+        self.watch_tree(self.root)
+        self.running = True
+        logger.info(f"Watching {self.root} for new files")
+        try:
+            while self.running:
+                for wd, mask, name in self.inotify.read_events(self.next_timeout()):
+                    self.handle_event(wd, mask, name)
+                ready = self.collect_ready()
+                if ready:
+                    self.apply(ready)
+        finally:
+            self.inotify.close()
+            self.inotify = None
+
+    def stop(self):
+        self.running = False
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python watch_mode.py <directory>")
+        sys.exit(1)
+    watcher = DirectoryWatcher(sys.argv[1])
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()